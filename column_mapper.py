@@ -3,15 +3,28 @@ Column Mapper - Smart Column Detection Engine
 Intelligently maps dataset columns to standardized field names using fuzzy matching and patterns.
 """
 
+import bisect
+import copy
 import json
+import os
 import re
-from typing import Dict, List, Optional, Tuple, Any
-from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Pattern, Tuple, Any
+import ahocorasick
+import numpy as np
 import pandas as pd
+from rapidfuzz import fuzz, process
 from dataclasses import dataclass
 
+# Summary status icons, indexed by how many confidence thresholds a mapping clears
+_STATUS_THRESHOLDS = (0.7, 0.9)
+_STATUS_ICONS = ("❓", "⚠️", "🎯")
 
-@dataclass
+# Distinct column names remembered per mapper for keyword/pattern lookups
+_COLUMN_CACHE_SIZE = 4096
+
+
+@dataclass(slots=True, frozen=True)
 class ColumnMappingResult:
     """Result of column mapping operation"""
     mapped_columns: Dict[str, str]  # standardized_name -> actual_column_name
@@ -28,20 +41,134 @@ class ColumnMapper:
     
     def __init__(self, config_path: str):
         """Initialize with mapping configuration"""
-        self.config = self._load_config(config_path)
+        loaded = _load_config(config_path)
+        # Each mapper owns its config, so editing it cannot leak into other mappers of the same file
+        self.config = copy.deepcopy(loaded.config)
         self.field_mappings = self.config.get('field_mappings', {})
         self.required_fields = self.config.get('required_fields', [])
         self.optional_fields = self.config.get('optional_fields', [])
         
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """Load mapping configuration from JSON file"""
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Configuration file not found: {config_path}")
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON in configuration file: {e}")
+        # Compiled patterns and lowercased aliases/keywords are shared by mappers of the same file
+        self._compiled = loaded.compiled
+        self._pattern_union = loaded.pattern_union
+        self._pattern_groups = loaded.pattern_groups
+        self._pattern_fallbacks = loaded.pattern_fallbacks
+        self._keyword_automaton = loaded.keyword_automaton
+        self._pattern_fields = lru_cache(maxsize=_COLUMN_CACHE_SIZE)(self._find_pattern_fields)
+        self._keyword_fields = lru_cache(maxsize=_COLUMN_CACHE_SIZE)(self._find_keyword_fields)
+        
+    @staticmethod
+    def _compile_field_mappings(field_mappings: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the alias and field-name structures used to score every field at once
+        
+        Args:
+            field_mappings: The 'field_mappings' section of the configuration
+            
+        Returns:
+            Dict with the fields in configuration order, their lowercased names, and
+            all lowercased aliases flattened with per-field offsets for np.maximum.reduceat
+        """
+        fields = list(field_mappings.keys())
+        aliases_flat: List[str] = []
+        alias_offsets: List[int] = []
+        alias_rows: List[int] = []
+        alias_owners: Dict[str, List[int]] = {}
+        
+        for row, std_field in enumerate(fields):
+            aliases_lower = [alias.lower() for alias in field_mappings[std_field].get('aliases', [])]
+            if aliases_lower:
+                alias_rows.append(row)
+                alias_offsets.append(len(aliases_flat))
+                aliases_flat.extend(aliases_lower)
+            for alias_lower in aliases_lower:
+                owners = alias_owners.setdefault(alias_lower, [])
+                if row not in owners:
+                    owners.append(row)
+        
+        return {
+            'fields': fields,
+            'fields_lower': [std_field.lower() for std_field in fields],
+            'field_rows': {std_field: row for row, std_field in enumerate(fields)},
+            'aliases_flat': aliases_flat,
+            'alias_offsets': np.array(alias_offsets, dtype=np.intp),
+            'alias_rows': np.array(alias_rows, dtype=np.intp),
+            'alias_owners': alias_owners,
+        }
+    
+    @staticmethod
+    def _compile_pattern_union(
+        field_mappings: Dict[str, Any]
+    ) -> Tuple[Optional[Pattern], Dict[str, str], Dict[str, List[Pattern]]]:
+        """
+        Compile the patterns of every field into a single regex
+        
+        Each field becomes an optional lookahead with its own named group, so one
+        match() at the start of a column name reports every field whose patterns
+        occur anywhere in it, not just the first one. Patterns that cannot be
+        embedded safely (capturing groups, backreferences, global inline flags)
+        are compiled on their own instead and searched separately.
+        
+        Args:
+            field_mappings: The 'field_mappings' section of the configuration
+            
+        Returns:
+            Tuple of (compiled union or None if there are no embeddable patterns,
+            group_name -> standardized_name, standardized_name -> standalone patterns)
+        """
+        branches = []
+        group_to_field = {}
+        fallbacks = {}
+        for index, (std_field, field_config) in enumerate(field_mappings.items()):
+            embeddable = []
+            for pattern in field_config.get('patterns', []):
+                try:
+                    # Groups would be renumbered (or clash by name) inside the union
+                    fits_union = re.compile(f"(?:{pattern})", re.IGNORECASE).groups == 0
+                except re.error:
+                    fits_union = False
+                if fits_union:
+                    embeddable.append(pattern)
+                else:
+                    fallbacks.setdefault(std_field, []).append(re.compile(pattern, re.IGNORECASE))
+            if not embeddable:
+                continue
+            group = f"field{index}"
+            alternation = '|'.join(f"(?:{pattern})" for pattern in embeddable)
+            branches.append(rf"(?:(?=[\s\S]*?(?P<{group}>{alternation}))|)")
+            group_to_field[group] = std_field
+        
+        if not branches:
+            return None, group_to_field, fallbacks
+        
+        return re.compile(''.join(branches), re.IGNORECASE), group_to_field, fallbacks
+    
+    @staticmethod
+    def _build_keyword_automaton(field_mappings: Dict[str, Any]) -> Optional[ahocorasick.Automaton]:
+        """
+        Build one Aho-Corasick automaton over the keywords of every field
+        
+        Args:
+            field_mappings: The 'field_mappings' section of the configuration
+            
+        Returns:
+            Automaton whose values are the fields owning each keyword, or None if there are no keywords
+        """
+        keyword_owners: Dict[str, List[str]] = {}
+        for std_field, field_config in field_mappings.items():
+            for keyword in field_config.get('keywords', []):
+                owners = keyword_owners.setdefault(keyword.lower(), [])
+                if std_field not in owners:
+                    owners.append(std_field)
+        
+        if not keyword_owners:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for keyword_lower, owners in keyword_owners.items():
+            automaton.add_word(keyword_lower, tuple(owners))
+        automaton.make_automaton()
+        return automaton
     
     def map_columns(self, df: pd.DataFrame, min_confidence: float = 0.6) -> ColumnMappingResult:
         """
@@ -55,23 +182,27 @@ class ColumnMapper:
             ColumnMappingResult with mapping details
         """
         available_columns = list(df.columns)
+        columns_lower = [column.lower().strip() for column in available_columns]
         mapped_columns = {}
         confidence_scores = {}
-        unmapped_columns = available_columns.copy()
         
-        # Process each standardized field
-        all_fields = list(self.field_mappings.keys())
+        # Score every (field, column) pair up front: rows follow the config, columns the DataFrame
+        scores = self._score_matrix(columns_lower, min_confidence)
+        taken = np.zeros(len(available_columns), dtype=bool)
         
-        for std_field in all_fields:
-            best_match, confidence = self._find_best_match(
-                std_field, available_columns, min_confidence
-            )
+        # Process each standardized field; a column claimed by one field is not offered to the next
+        for row, std_field in enumerate(self._compiled['fields']):
+            if taken.all():
+                break
+            
+            best_match, confidence = self._find_best_match(scores[row], taken, min_confidence)
             
-            if best_match:
-                mapped_columns[std_field] = best_match
+            if best_match is not None:
+                mapped_columns[std_field] = available_columns[best_match]
                 confidence_scores[std_field] = confidence
-                if best_match in unmapped_columns:
-                    unmapped_columns.remove(best_match)
+                taken[best_match] = True
+        
+        unmapped_columns = [available_columns[index] for index in np.flatnonzero(~taken)]
         
         # Check for missing required fields
         missing_required = [
@@ -86,77 +217,125 @@ class ColumnMapper:
             missing_required=missing_required
         )
     
-    def _find_best_match(self, std_field: str, available_columns: List[str], 
-                        min_confidence: float) -> Tuple[Optional[str], float]:
+    @staticmethod
+    def _find_best_match(field_scores: np.ndarray, taken: np.ndarray, 
+                        min_confidence: float) -> Tuple[Optional[int], float]:
         """
         Find the best matching column for a standardized field
         
         Args:
-            std_field: Standardized field name to match
-            available_columns: List of available column names
+            field_scores: The field's row of the score matrix
+            taken: Mask of columns already claimed by earlier fields
             min_confidence: Minimum confidence threshold
             
         Returns:
-            Tuple of (best_match_column, confidence_score)
+            Tuple of (index of the best matching column, confidence_score)
         """
-        field_config = self.field_mappings.get(std_field, {})
-        best_match = None
-        best_confidence = 0.0
-        
-        for column in available_columns:
-            confidence = self._calculate_match_confidence(
-                std_field, column, field_config
-            )
-            
-            if confidence > best_confidence and confidence >= min_confidence:
-                best_match = column
-                best_confidence = confidence
+        # Claimed columns can never win; argmax keeps the leftmost column on ties
+        candidate_scores = np.where(taken, -1.0, field_scores)
+        best_index = int(candidate_scores.argmax())
+        best_confidence = float(candidate_scores[best_index])
+        if best_confidence > 0.0 and best_confidence >= min_confidence:
+            return best_index, best_confidence
         
-        return best_match, best_confidence
+        return None, 0.0
     
-    def _calculate_match_confidence(self, std_field: str, column: str, 
-                                  field_config: Dict[str, Any]) -> float:
+    def _score_matrix(self, columns_lower: List[str], min_confidence: float) -> np.ndarray:
         """
-        Calculate confidence score for a potential column match
+        Calculate the confidence score of every field against every column
         
         Args:
-            std_field: Standardized field name
-            column: Actual column name to evaluate
-            field_config: Configuration for this field
+            columns_lower: Lowercased, stripped column names
+            min_confidence: Minimum confidence threshold, used to prune weak fuzzy pairs
             
         Returns:
-            Confidence score between 0 and 1
+            Array of shape (fields, columns) with confidence scores between 0 and 1
         """
-        column_lower = column.lower().strip()
-        scores = []
+        compiled = self._compiled
+        shape = (len(compiled['fields']), len(columns_lower))
+        if not columns_lower:
+            return np.zeros(shape)
+        
+        exact = np.zeros(shape, dtype=bool)
+        fuzzy = np.zeros(shape)
+        pattern = np.zeros(shape, dtype=bool)
+        keyword = np.zeros(shape, dtype=bool)
         
         # 1. Exact match with aliases
-        aliases = field_config.get('aliases', [])
-        if column_lower in [alias.lower() for alias in aliases]:
-            return 1.0
-        
-        # 2. Fuzzy string matching with aliases
-        for alias in aliases:
-            similarity = SequenceMatcher(None, column_lower, alias.lower()).ratio()
-            scores.append(similarity * 0.9)  # Slightly lower weight for fuzzy
-        
-        # 3. Pattern matching
-        patterns = field_config.get('patterns', [])
-        for pattern in patterns:
-            if re.search(pattern, column_lower, re.IGNORECASE):
-                scores.append(0.85)
-        
-        # 4. Keyword matching
-        keywords = field_config.get('keywords', [])
-        for keyword in keywords:
-            if keyword.lower() in column_lower:
-                scores.append(0.7)
+        for col, column_lower in enumerate(columns_lower):
+            exact[compiled['alias_owners'].get(column_lower, []), col] = True
+        
+        # 2. Fuzzy string matching with aliases: one cdist over all aliases, then the best alias per field
+        if compiled['aliases_flat']:
+            similarity = process.cdist(
+                compiled['aliases_flat'], columns_lower, scorer=fuzz.ratio,
+                # rapidfuzz rejects cutoffs outside 0-100; thresholds outside [0, 1] are still applied below
+                score_cutoff=min(max(min_confidence, 0.0), 1.0) * 100, dtype=np.float64
+            )
+            best_alias = np.maximum.reduceat(similarity, compiled['alias_offsets'], axis=0)
+            fuzzy[compiled['alias_rows']] = best_alias / 100 * 0.9  # Slightly lower weight for fuzzy
+        
+        # 3. Pattern matching and 4. Keyword matching, one pass per column for all fields
+        field_rows = compiled['field_rows']
+        for col, column_lower in enumerate(columns_lower):
+            pattern[[field_rows[std_field] for std_field in self._pattern_fields(column_lower)], col] = True
+            keyword[[field_rows[std_field] for std_field in self._keyword_fields(column_lower)], col] = True
         
         # 5. Contains standardized field name
-        if std_field.lower() in column_lower:
-            scores.append(0.6)
+        contains = np.array([
+            [std_lower in column_lower for column_lower in columns_lower]
+            for std_lower in compiled['fields_lower']
+        ], dtype=bool).reshape(shape)
+        
+        return np.maximum.reduce([
+            exact * 1.0, fuzzy, pattern * 0.85, keyword * 0.7, contains * 0.6
+        ])
+    
+    def _find_pattern_fields(self, column_lower: str) -> FrozenSet[str]:
+        """
+        Find every standardized field with a pattern matching a column name
+        
+        Args:
+            column_lower: Lowercased, stripped column name to test
+            
+        Returns:
+            Set of standardized field names, found with a single regex match
+            plus a search per standalone pattern
+        """
+        fields = set()
+        if self._pattern_union is not None:
+            match = self._pattern_union.match(column_lower)
+            fields.update(
+                self._pattern_groups[group]
+                for group, value in match.groupdict().items()
+                if value is not None
+            )
+        
+        fields.update(
+            std_field
+            for std_field, patterns in self._pattern_fallbacks.items()
+            if any(pattern.search(column_lower) for pattern in patterns)
+        )
+        return frozenset(fields)
+    
+    def _find_keyword_fields(self, column_lower: str) -> FrozenSet[str]:
+        """
+        Find every standardized field with a keyword inside a column name
+        
+        Args:
+            column_lower: Lowercased, stripped column name to scan
+            
+        Returns:
+            Set of standardized field names, found in a single pass over the name
+        """
+        if self._keyword_automaton is None:
+            return frozenset()
         
-        return max(scores) if scores else 0.0
+        return frozenset(
+            std_field
+            for _, owners in self._keyword_automaton.iter(column_lower)
+            for std_field in owners
+        )
     
     def get_mapped_dataframe(self, df: pd.DataFrame, 
                            mapping_result: ColumnMappingResult) -> pd.DataFrame:
@@ -176,9 +355,9 @@ class ColumnMapper:
             for std_field, actual_col in mapping_result.mapped_columns.items()
         }
         
-        # Select only mapped columns and rename them
-        mapped_df = df[list(rename_mapping.keys())].copy()
-        mapped_df = mapped_df.rename(columns=rename_mapping)
+        # Select only mapped columns; the selection is already a new frame, so rename it in place
+        mapped_df = df[list(rename_mapping.keys())]
+        mapped_df.columns = [rename_mapping[column] for column in mapped_df.columns]
         
         return mapped_df
     
@@ -224,7 +403,7 @@ class ColumnMapper:
         print(f"\n✅ MAPPED COLUMNS ({len(mapping_result.mapped_columns)}):")
         for std_field, actual_col in mapping_result.mapped_columns.items():
             confidence = mapping_result.confidence_scores[std_field]
-            status = "🎯" if confidence >= 0.9 else "⚠️" if confidence >= 0.7 else "❓"
+            status = _STATUS_ICONS[bisect.bisect_right(_STATUS_THRESHOLDS, confidence)]
             print(f"  {status} {std_field:<20} → {actual_col:<25} ({confidence:.2f})")
         
         if mapping_result.missing_required:
@@ -240,6 +419,57 @@ class ColumnMapper:
         print("\n" + "=" * 50)
 
 
+class _LoadedConfig(NamedTuple):
+    """Parsed configuration plus the matching structures compiled from it"""
+    config: Dict[str, Any]  # pristine parsed JSON; mappers take a deep copy
+    compiled: Dict[str, Any]
+    pattern_union: Optional[Pattern]
+    pattern_groups: Dict[str, str]
+    pattern_fallbacks: Dict[str, List[Pattern]]
+    keyword_automaton: Optional[ahocorasick.Automaton]
+
+
+def _load_config(config_path: str) -> _LoadedConfig:
+    """Load mapping configuration, reusing the cached copy while the file is unchanged"""
+    try:
+        mtime = os.path.getmtime(config_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Configuration file not found: {config_path}")
+    return _load_config_cached(os.path.abspath(config_path), mtime)
+
+
+@lru_cache(maxsize=32)
+def _load_config_cached(config_path: str, mtime: float) -> _LoadedConfig:
+    """
+    Load mapping configuration from JSON file and compile its matchers
+    
+    Args:
+        config_path: Absolute path to the configuration file
+        mtime: Modification time of the file, so edits invalidate the cache entry
+        
+    Returns:
+        _LoadedConfig shared by every mapper built from this file version
+    """
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Configuration file not found: {config_path}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in configuration file: {e}")
+    
+    field_mappings = config.get('field_mappings', {})
+    pattern_union, pattern_groups, pattern_fallbacks = ColumnMapper._compile_pattern_union(field_mappings)
+    return _LoadedConfig(
+        config=config,
+        compiled=ColumnMapper._compile_field_mappings(field_mappings),
+        pattern_union=pattern_union,
+        pattern_groups=pattern_groups,
+        pattern_fallbacks=pattern_fallbacks,
+        keyword_automaton=ColumnMapper._build_keyword_automaton(field_mappings),
+    )
+
+
 # Usage example and testing functions
 def test_column_mapper():
     """Test the column mapper with sample data"""
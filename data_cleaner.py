@@ -1,45 +1,88 @@
 # etl/data_cleaner.py
+import numpy as np
 import pandas as pd
 
 print("DEBUG: Running data_cleaner.py version with Order Date and Ship Date columns.")
 
+DATE_FORMAT = '%m/%d/%Y'  # format used by the retail export
+
+def _parse_date_strings(values: pd.Series) -> pd.Series:
+    # The export's own format first, so ambiguous day/month strings are never guessed
+    parsed = pd.to_datetime(values, format=DATE_FORMAT, errors='coerce')
+
+    # Other layouts are parsed rather than dropped: first with one format inferred from the data,
+    # then value by value for whatever still fails. Offsets are converted to UTC and dropped, so
+    # the column stays naive datetime64 whatever the input
+    for fallback in ({}, {'format': 'mixed'}):
+        retry = parsed.isna() & values.notna()
+        if not retry.any():
+            break
+        reparsed = pd.to_datetime(values[retry], errors='coerce', utc=True, **fallback)
+        parsed = parsed.fillna(reparsed.dt.tz_localize(None))
+    return parsed
+
+def _parse_dates(values: pd.Series) -> pd.Series:
+    # A few thousand distinct dates repeat across every row, so each distinct string is parsed once
+    codes, uniques = pd.factorize(values)
+    parsed = _parse_date_strings(pd.Series(uniques, dtype=values.dtype)).to_numpy(dtype='datetime64[ns]')
+    # Code -1 (missing) picks the trailing NaT
+    lookup = np.append(parsed, np.datetime64('NaT', 'ns'))
+    return pd.Series(lookup[codes], index=values.index, name=values.name)
+
+def _parse_numbers(values: pd.Series) -> np.ndarray:
+    # Coerce rather than fail so one bad cell cannot abort the load, then fill the gaps with 0
+    return pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype='float64')
+
+def _parse_ids(values: pd.Series) -> pd.Series:
+    # Whole numbers only; anything else becomes <NA> instead of failing the integer column on upload
+    numbers = pd.to_numeric(values, errors='coerce')
+    return numbers.where(numbers % 1 == 0).astype('Int64')
+
 def clean_sales(df: pd.DataFrame) -> pd.DataFrame:
-    # Convert date columns to datetime
-    df.loc[:, 'Order Date'] = pd.to_datetime(df['Order Date'], errors='coerce')
-    df.loc[:, 'Ship Date'] = pd.to_datetime(df['Ship Date'], errors='coerce')
+    # Convert date columns to datetime, coercing invalid values to NaT
+    order_date = _parse_dates(df['Order Date'])
+    ship_date = _parse_dates(df['Ship Date'])
 
-    # Remove rows with missing or invalid dates
-    df = df.dropna(subset=['Order Date'])
+    # Ensure numeric columns are correct; malformed values such as '1,234.50' become 0
+    sales = _parse_numbers(df['Sales'])
+    quantity = _parse_numbers(df['Quantity']).astype('int64')
 
-    # Ensure numeric columns are correct
-    numeric_cols = ['Sales', 'Quantity', 'Discount', 'Profit']
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-        df[col] = df[col].fillna(0)
-    df['Quantity'] = df['Quantity'].astype(int)
-    df['Sales'] = df['Sales'].astype(float)
-    df['Discount'] = df['Discount'].astype(float)
-    df['Profit'] = df['Profit'].astype(float)
+    # Derive Price per Unit if not present (zero quantity keeps the raw sales value)
+    price_per_unit = np.divide(sales, quantity, out=sales.copy(), where=quantity != 0)
 
-    # Derive Price per Unit if not present
-    df['Price per Unit'] = df['Sales'] / df['Quantity'].replace(0, 1)  # Avoid division by zero
+    df = df.assign(**{
+        'Row ID': _parse_ids(df['Row ID']),
+        'Order Date': order_date,
+        'Ship Date': ship_date,
+        'Sales': sales,
+        'Quantity': quantity,
+        'Discount': _parse_numbers(df['Discount']),
+        'Profit': _parse_numbers(df['Profit']),
+        'Price per Unit': price_per_unit,
+    })
 
-    # Drop duplicates based on Row ID or Order ID
-    df = df.drop_duplicates(subset='Row ID')
+    # Remove rows with missing or invalid dates
+    df = df[df['Order Date'].notna()]
 
-    return df
+    # Drop duplicates based on Row ID
+    return df[~df['Row ID'].duplicated().to_numpy()]
 
 def clean_customers(df: pd.DataFrame) -> pd.DataFrame:
     # Drop duplicates based on Customer ID
-    df = df.drop_duplicates(subset='Customer ID')
+    df = df[~df['Customer ID'].duplicated()]
 
-    # Standardize Segment values (if present)
+    # Standardize Segment values (if present); the few distinct values are cleaned once as categories
     if 'Segment' in df.columns:
-        df['Segment'] = df['Segment'].astype(str).str.strip().str.title()
+        segment = df['Segment'].astype('category')
+        labels = segment.cat.categories.astype(str).str.strip().str.title()
+        categories = labels.unique()
+        # Variants such as ' consumer' and 'Consumer' merge; code -1 (missing) maps to the trailing -1
+        remap = np.append(categories.get_indexer(labels), -1)
+        df = df.assign(Segment=pd.Categorical.from_codes(remap[segment.cat.codes.to_numpy()], categories=categories))
 
     # Ensure Age is numeric and reasonable (if present)
     if 'Age' in df.columns:
-        df['Age'] = pd.to_numeric(df['Age'], errors='coerce')
+        df = df.assign(Age=pd.to_numeric(df['Age'], errors='coerce'))
         mask = df['Age'].between(10, 100)
         df = df.loc[mask].copy()
 
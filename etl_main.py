@@ -1,39 +1,159 @@
 import pandas as pd
-from sqlalchemy import create_engine
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from sqlalchemy import create_engine, text
+from sqlalchemy.types import NVARCHAR, DateTime, Float, Integer
 from etl.data_cleaner import clean_sales, clean_customers
 from etl.config import DB_CONFIG
 from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
 import os
 
+SALES_COLUMNS = ['Row ID', 'Order ID', 'Order Date', 'Ship Date', 'Customer ID', 'Category', 'Sales', 'Quantity', 'Discount', 'Profit']
+CUSTOMER_COLUMNS = ['Customer ID', 'Customer Name', 'Segment']
+CSV_COLUMNS = list(dict.fromkeys(SALES_COLUMNS + CUSTOMER_COLUMNS))  # the only columns parsed from the CSV
+
+# Every column is read as text: unpinned types are inferred from the first block, so a later batch
+# that disagrees (or a column that is all null at first) would fail the whole read, and Arrow has no
+# coerce-on-error mode; clean_sales coerces IDs, numbers and dates the way the old loader did
+CSV_COLUMN_TYPES = {column: pa.string() for column in CSV_COLUMNS}
+CSV_BLOCK_SIZE = 8 << 20  # bytes parsed per record batch
+ARROW_TYPES_MAPPER = {pa.string(): pd.StringDtype("pyarrow")}.get  # keep text Arrow-backed
+SQL_BATCH_SIZE = 10_000  # rows per executemany batch
+
+# Explicit column types so SQL Server gets tight types instead of NVARCHAR(max)/inferred ones
+SALES_SQL_TYPES = {
+    'Row ID': Integer(),
+    'Order ID': NVARCHAR(50),
+    'Order Date': DateTime(),
+    'Ship Date': DateTime(),
+    'Customer ID': NVARCHAR(50),
+    'Category': NVARCHAR(100),
+    'Sales': Float(),
+    'Quantity': Integer(),
+    'Discount': Float(),
+    'Profit': Float(),
+    'Price per Unit': Float(),
+}
+CUSTOMER_SQL_TYPES = {
+    'Customer ID': NVARCHAR(50),
+    'Customer Name': NVARCHAR(255),
+    'Segment': NVARCHAR(50),
+}
+
+# Live table -> column types; each run loads '<table>_staging' and swaps it in only once complete
+TABLE_SQL_TYPES = {
+    'sales_cleaned': SALES_SQL_TYPES,
+    'customers_cleaned': CUSTOMER_SQL_TYPES,
+}
+STAGING_SUFFIX = '_staging'
+
+_ENGINE = None  # created on first use and shared for the life of the process
+
 def connect_to_db():
-    encoded_password = quote_plus(DB_CONFIG['password'])
-    conn_str = f"mssql+pyodbc://{DB_CONFIG['username']}:{encoded_password}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}?driver={DB_CONFIG['driver']}"
-    return create_engine(conn_str)
+    global _ENGINE
+    if _ENGINE is None:
+        encoded_password = quote_plus(DB_CONFIG['password'])
+        conn_str = f"mssql+pyodbc://{DB_CONFIG['username']}:{encoded_password}@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}?driver={DB_CONFIG['driver']}"
+        _ENGINE = create_engine(conn_str, fast_executemany=True, pool_pre_ping=True, pool_size=5, max_overflow=10)
+    return _ENGINE
 
-def main():
-    try:
-        # Load the combined dataset
-        csv_path = os.path.join(os.path.dirname(__file__), 'retail_combined.csv')
-        df = pd.read_csv(csv_path, encoding="latin1")
+def create_staging_tables(engine):
+    # Drop and recreate empty staging tables, so even a CSV without data rows replaces the live tables
+    for table, sql_types in TABLE_SQL_TYPES.items():
+        pd.DataFrame(columns=list(sql_types)).to_sql(
+            table + STAGING_SUFFIX, con=engine, if_exists='replace', index=False, dtype=sql_types
+        )
+
+def swap_in_staging_tables(engine):
+    # Replace both live tables in one transaction, so a failed run never leaves them partly loaded
+    with engine.begin() as conn:
+        quote = conn.dialect.identifier_preparer.quote
+        for table in TABLE_SQL_TYPES:
+            staging = table + STAGING_SUFFIX
+            conn.execute(text(f"DROP TABLE IF EXISTS {quote(table)}"))
+            if conn.dialect.name == 'mssql':
+                conn.execute(text(f"EXEC sp_rename '{staging}', '{table}'"))
+            else:
+                conn.execute(text(f"ALTER TABLE {quote(staging)} RENAME TO {quote(table)}"))
 
-        print("CSV columns:", df.columns.tolist())
+def drop_staging_tables(engine):
+    with engine.begin() as conn:
+        quote = conn.dialect.identifier_preparer.quote
+        for table in TABLE_SQL_TYPES:
+            conn.execute(text(f"DROP TABLE IF EXISTS {quote(table + STAGING_SUFFIX)}"))
 
-        # Separate into sales and customer DataFrames
-        sales_df = df[['Row ID', 'Order ID', 'Order Date', 'Ship Date', 'Customer ID', 'Category', 'Sales', 'Quantity', 'Discount', 'Profit']]
-        cust_df = df[['Customer ID', 'Customer Name', 'Segment']].drop_duplicates()
+_NULL_KEY = object()  # stands in for every missing key, since NaN never equals itself in a set
 
-        # Clean the data
-        sales_df = clean_sales(sales_df if isinstance(sales_df, pd.DataFrame) else pd.DataFrame())
-        cust_df = clean_customers(cust_df if isinstance(cust_df, pd.DataFrame) else pd.DataFrame())
+def drop_seen_keys(df, key, seen):
+    # Membership is tested per row against the set, so the cost is O(batch) however many keys are seen
+    keys = df[key]
+    is_null = keys.isna().to_numpy(dtype=bool)
+    is_seen = keys.map(seen.__contains__).to_numpy(dtype=bool)
+    # Missing keys count as one value, so only the first null-keyed row of the whole run is kept
+    is_seen[is_null] = _NULL_KEY in seen
+    df = df[~is_seen]
+    seen.update(df[key].dropna())
+    if is_null[~is_seen].any():
+        seen.add(_NULL_KEY)
+    return df
+
+def main(csv_path=None):
+    try:
+        # Stream the combined dataset so only one record batch is in memory at a time
+        if csv_path is None:
+            csv_path = os.path.join(os.path.dirname(__file__), 'retail_combined.csv')
+        reader = pacsv.open_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(encoding="latin1", block_size=CSV_BLOCK_SIZE),
+            convert_options=pacsv.ConvertOptions(
+                column_types=CSV_COLUMN_TYPES,
+                include_columns=CSV_COLUMNS,
+                strings_can_be_null=True,
+            ),
+        )
+
+        print("Loaded CSV columns:", reader.schema.names)
 
-        # Connect and upload
         engine = connect_to_db()
-        sales_df.to_sql('sales_cleaned', con=engine, if_exists='replace', index=False)
-        cust_df.to_sql('customers_cleaned', con=engine, if_exists='replace', index=False)
+        create_staging_tables(engine)
+        try:
+            # Duplicates can span batches, so remember the keys already written (one entry per unique ID)
+            seen_row_ids = set()
+            seen_customer_ids = set()
+
+            # The two tables are independent, so each batch writes them concurrently on separate connections
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                for batch in reader:
+                    # Separate into sales and customer DataFrames straight from the Arrow batch, so no
+                    # combined frame is materialised and copied, then clean them
+                    sales_df = clean_sales(batch.select(SALES_COLUMNS).to_pandas(types_mapper=ARROW_TYPES_MAPPER))
+                    sales_df = drop_seen_keys(sales_df, 'Row ID', seen_row_ids)
+
+                    cust_df = batch.select(CUSTOMER_COLUMNS).to_pandas(types_mapper=ARROW_TYPES_MAPPER).drop_duplicates()
+                    cust_df = drop_seen_keys(cust_df, 'Customer ID', seen_customer_ids)
+                    cust_df = clean_customers(cust_df)
+
+                    # Append this batch to the staging tables, waiting for both before the next batch
+                    uploads = [
+                        executor.submit(sales_df.to_sql, 'sales_cleaned' + STAGING_SUFFIX, con=engine,
+                                        if_exists='append', index=False, chunksize=SQL_BATCH_SIZE,
+                                        dtype=SALES_SQL_TYPES),
+                        executor.submit(cust_df.to_sql, 'customers_cleaned' + STAGING_SUFFIX, con=engine,
+                                        if_exists='append', index=False, chunksize=SQL_BATCH_SIZE,
+                                        dtype=CUSTOMER_SQL_TYPES),
+                    ]
+                    for upload in uploads:
+                        upload.result()
+
+            swap_in_staging_tables(engine)
+        finally:
+            # Discards a failed run's partial load; after a successful swap there is nothing left to drop
+            drop_staging_tables(engine)
 
         print("✅ ETL process completed and data loaded into SQL Server.")
     except Exception as e:
-        print(f"❌ ETL process failed: {e}")
+        print(f"❌ ETL process failed (existing tables were left unchanged): {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+import pandas as pd
+from sqlalchemy import create_engine, inspect
+
+# The modules are imported as the 'etl' package when deployed; register this directory under that name
+HERE = os.path.dirname(os.path.abspath(__file__))
+if 'etl' not in sys.modules:
+    etl_package = types.ModuleType('etl')
+    etl_package.__path__ = [HERE]
+    sys.modules['etl'] = etl_package
+
+from etl import etl_main  # noqa: E402
+
+CSV_HEADER = 'Row ID,Order ID,Order Date,Ship Date,Customer ID,Customer Name,Segment,Category,Sales,Quantity,Discount,Profit\n'
+
+
+def csv_row(row_id, customer_id, segment='Consumer'):
+    return f'{row_id},O-{row_id},01/02/2024,01/05/2024,{customer_id},Name {customer_id},{segment},Tech,10.5,2,0,1.5\n'
+
+
+class DropSeenKeysTest(unittest.TestCase):
+    def test_keys_seen_in_earlier_batches_are_dropped(self):
+        seen = set()
+        first = etl_main.drop_seen_keys(pd.DataFrame({'id': ['a', 'b']}), 'id', seen)
+        second = etl_main.drop_seen_keys(pd.DataFrame({'id': ['b', 'c', 'a']}), 'id', seen)
+        self.assertEqual(first['id'].tolist(), ['a', 'b'])
+        self.assertEqual(second['id'].tolist(), ['c'])
+
+    def test_only_first_null_key_of_the_run_is_kept(self):
+        seen = set()
+        first = etl_main.drop_seen_keys(pd.DataFrame({'id': [1.0, None]}), 'id', seen)
+        second = etl_main.drop_seen_keys(pd.DataFrame({'id': [None, 2.0]}), 'id', seen)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second['id'].tolist(), [2.0])
+
+
+class MainTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'etl.db')}")
+        self.addCleanup(self.engine.dispose)
+        for patch in (
+            mock.patch.object(etl_main, 'connect_to_db', return_value=self.engine),
+            mock.patch.object(etl_main, 'CSV_BLOCK_SIZE', 512),  # a few rows per batch
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def write_csv(self, rows):
+        path = os.path.join(self.tmp.name, 'retail_combined.csv')
+        with open(path, 'w', encoding='latin1') as f:
+            f.write(CSV_HEADER + ''.join(rows))
+        return path
+
+    def read_table(self, table):
+        return pd.read_sql_table(table, self.engine)
+
+    def test_duplicates_across_batches_are_loaded_once(self):
+        rows = [csv_row(i, f'C{i % 5}') for i in range(1, 41)]
+        rows += [csv_row(i, f'C{i % 5}') for i in range(1, 41, 3)]  # repeats land in later batches
+        etl_main.main(self.write_csv(rows))
+
+        sales = self.read_table('sales_cleaned')
+        customers = self.read_table('customers_cleaned')
+        self.assertEqual(sorted(sales['Row ID']), list(range(1, 41)))
+        self.assertEqual(sorted(customers['Customer ID']), [f'C{i}' for i in range(5)])
+
+    def test_later_batches_may_disagree_with_the_first_one(self):
+        rows = [csv_row(i, f'C{i}', segment='') for i in range(1, 21)]  # Segment all null at first
+        rows += [csv_row('x1', 'C99', segment='Corporate')]  # then a text Row ID
+        etl_main.main(self.write_csv(rows))
+
+        sales = self.read_table('sales_cleaned')
+        self.assertEqual(len(sales), 21)
+        self.assertEqual(sales['Row ID'].isna().sum(), 1)
+        self.assertIn('Corporate', self.read_table('customers_cleaned')['Segment'].tolist())
+
+    def test_failed_run_leaves_existing_tables_unchanged(self):
+        etl_main.main(self.write_csv([csv_row(i, f'C{i}') for i in range(1, 4)]))
+
+        clean_sales = etl_main.clean_sales
+        calls = []
+
+        def fail_on_second_batch(df):
+            calls.append(df)
+            if len(calls) == 2:
+                raise RuntimeError('boom')
+            return clean_sales(df)
+
+        with mock.patch.object(etl_main, 'clean_sales', fail_on_second_batch):
+            etl_main.main(self.write_csv([csv_row(i, f'C{i}') for i in range(100, 140)]))
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(sorted(self.read_table('sales_cleaned')['Row ID']), [1, 2, 3])
+        self.assertEqual(len(self.read_table('customers_cleaned')), 3)
+        self.assertFalse(inspect(self.engine).has_table('sales_cleaned_staging'))
+
+    def test_csv_without_rows_empties_the_tables(self):
+        etl_main.main(self.write_csv([csv_row(1, 'C1')]))
+        etl_main.main(self.write_csv([]))
+
+        self.assertTrue(self.read_table('sales_cleaned').empty)
+        self.assertTrue(self.read_table('customers_cleaned').empty)
+
+
+if __name__ == '__main__':
+    unittest.main()